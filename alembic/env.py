@@ -1,6 +1,9 @@
+import asyncio
+import re
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 # Import Base from your models file
@@ -16,6 +19,14 @@ if config.config_file_name is not None:
 # Set target_metadata to your Base.metadata
 target_metadata = Base.metadata
 
+# Partitions of logs (see 733cc13822d7) are reflected as plain tables
+LOGS_PARTITION = re.compile(r"logs_(p\d+|default)")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Keep autogenerate from dropping the logs partitions."""
+    return not (type_ == "table" and LOGS_PARTITION.fullmatch(name))
+
 
 # Functions to run migrations offline and online
 def run_migrations_offline() -> None:
@@ -26,27 +37,41 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
-def run_migrations_online() -> None:
-    """Run migrations in 'online' mode."""
-    connectable = engine_from_config(
+def do_run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations() -> None:
+    """Run migrations through the same asyncpg driver as the app."""
+    connectable = async_engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
 
-        with context.begin_transaction():
-            context.run_migrations()
+    await connectable.dispose()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode."""
+    asyncio.run(run_async_migrations())
 
 
 # Check if running offline or online
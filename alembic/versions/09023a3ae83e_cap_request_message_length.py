@@ -0,0 +1,32 @@
+"""Cap request message length
+
+Revision ID: 09023a3ae83e
+Revises: fb46e8df6d15
+Create Date: 2026-10-15 12:05:36.117492
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '09023a3ae83e'
+down_revision: Union[str, None] = 'fb46e8df6d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('requests', 'message',
+               existing_type=sa.Text(),
+               type_=sa.String(length=4096),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('requests', 'message',
+               existing_type=sa.String(length=4096),
+               type_=sa.Text(),
+               existing_nullable=False)
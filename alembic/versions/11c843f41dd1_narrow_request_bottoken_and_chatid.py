@@ -0,0 +1,45 @@
+"""Narrow request bottoken and chatid
+
+Revision ID: 11c843f41dd1
+Revises: 7c0323f996c8
+Create Date: 2026-10-15 14:52:17.480663
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11c843f41dd1'
+down_revision: Union[str, None] = '7c0323f996c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('requests', 'bottoken',
+               existing_type=sa.String(),
+               type_=sa.String(length=46),
+               existing_nullable=False)
+    op.alter_column('requests', 'chatid',
+               existing_type=sa.String(),
+               type_=sa.BigInteger(),
+               existing_nullable=False,
+               postgresql_using='chatid::bigint')
+    op.create_index(
+        op.f('ix_requests_chatid'), 'requests', ['chatid'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_requests_chatid'), table_name='requests')
+    op.alter_column('requests', 'chatid',
+               existing_type=sa.BigInteger(),
+               type_=sa.String(),
+               existing_nullable=False)
+    op.alter_column('requests', 'bottoken',
+               existing_type=sa.String(length=46),
+               type_=sa.String(),
+               existing_nullable=False)
@@ -0,0 +1,32 @@
+"""Add log request_id, id index
+
+Revision ID: 185079d11702
+Revises: 09023a3ae83e
+Create Date: 2026-10-15 13:48:09.671250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '185079d11702'
+down_revision: Union[str, None] = '09023a3ae83e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_logs_request_id_id', 'logs', ['request_id', 'id'], unique=False
+    )
+    # The composite index covers plain request_id lookups as well
+    op.drop_index(op.f('ix_logs_request_id'), table_name='logs')
+
+
+def downgrade() -> None:
+    op.create_index(
+        op.f('ix_logs_request_id'), 'logs', ['request_id'], unique=False
+    )
+    op.drop_index('ix_logs_request_id_id', table_name='logs')
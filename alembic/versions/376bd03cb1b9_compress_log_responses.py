@@ -0,0 +1,66 @@
+"""Compress log responses
+
+Revision ID: 376bd03cb1b9
+Revises: 733cc13822d7
+Create Date: 2026-10-15 17:26:40.158302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision: str = '376bd03cb1b9'
+down_revision: Union[str, None] = '733cc13822d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def convert_rows(source: str, target: str, convert) -> None:
+    # Copy source into target for every log, BATCH_SIZE rows at a time
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                f"SELECT id, {source} FROM logs WHERE id > :last_id "
+                f"ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            sa.text(f"UPDATE logs SET {target} = :value WHERE id = :id"),
+            [{"id": row[0], "value": convert(row[1])} for row in rows],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.add_column(
+        'logs', sa.Column('response_zst', sa.LargeBinary(), nullable=True)
+    )
+    compressor = zstandard.ZstdCompressor(level=3)
+    convert_rows(
+        'response', 'response_zst',
+        lambda response: compressor.compress(response.encode()),
+    )
+    op.alter_column('logs', 'response_zst', nullable=False)
+    op.drop_column('logs', 'response')
+
+
+def downgrade() -> None:
+    op.add_column('logs', sa.Column('response', sa.Text(), nullable=True))
+    decompressor = zstandard.ZstdDecompressor()
+    convert_rows(
+        'response_zst', 'response',
+        lambda response_zst: decompressor.decompress(response_zst).decode(),
+    )
+    op.alter_column('logs', 'response', nullable=False)
+    op.drop_column('logs', 'response_zst')
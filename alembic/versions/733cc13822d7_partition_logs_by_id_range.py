@@ -0,0 +1,92 @@
+"""Partition logs by id range
+
+Revision ID: 733cc13822d7
+Revises: f2287592d137
+Create Date: 2026-10-15 16:09:25.613084
+
+Logs are split into partitions of LOGS_PARTITION_SIZE ids (logs_p0,
+logs_p1, ...) plus a default partition. Create the next partition ahead of
+time with:
+
+    CREATE TABLE logs_p2 PARTITION OF logs
+        FOR VALUES FROM (20000000) TO (30000000);
+
+and drop old logs with DROP TABLE logs_p0.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '733cc13822d7'
+down_revision: Union[str, None] = 'f2287592d137'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOGS_PARTITION_SIZE = 10_000_000
+LOGS_INITIAL_PARTITIONS = 2
+
+
+def upgrade() -> None:
+    # Move the existing table aside, freeing its index and constraint names
+    op.execute("ALTER TABLE logs RENAME TO logs_old")
+    op.execute("ALTER TABLE logs_old RENAME CONSTRAINT logs_pkey "
+               "TO logs_old_pkey")
+    op.drop_index('ix_logs_request_id_id', table_name='logs_old')
+    op.drop_index('ix_logs_id', table_name='logs_old')
+
+    # Partitioned parent, ids keep coming from the existing sequence
+    op.execute("""
+        CREATE TABLE logs (
+            id INTEGER NOT NULL DEFAULT nextval('logs_id_seq'),
+            response TEXT NOT NULL,
+            request_id INTEGER REFERENCES requests (id),
+            PRIMARY KEY (id)
+        ) PARTITION BY RANGE (id)
+    """)
+    for number in range(LOGS_INITIAL_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE logs_p{number} PARTITION OF logs "
+            f"FOR VALUES FROM ({number * LOGS_PARTITION_SIZE}) "
+            f"TO ({(number + 1) * LOGS_PARTITION_SIZE})"
+        )
+    op.execute("CREATE TABLE logs_default PARTITION OF logs DEFAULT")
+    op.create_index('ix_logs_id', 'logs', ['id'], unique=False)
+    op.create_index(
+        'ix_logs_request_id_id', 'logs', ['request_id', 'id'], unique=False
+    )
+
+    # Copy the rows over and hand the sequence to the new table
+    op.execute("INSERT INTO logs (id, response, request_id) "
+               "SELECT id, response, request_id FROM logs_old")
+    op.execute("ALTER SEQUENCE logs_id_seq OWNED BY logs.id")
+    op.drop_table('logs_old')
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE logs RENAME TO logs_partitioned")
+    op.execute("ALTER TABLE logs_partitioned RENAME CONSTRAINT logs_pkey "
+               "TO logs_partitioned_pkey")
+    op.drop_index('ix_logs_request_id_id', table_name='logs_partitioned')
+    op.drop_index('ix_logs_id', table_name='logs_partitioned')
+
+    op.execute("""
+        CREATE TABLE logs (
+            id INTEGER NOT NULL DEFAULT nextval('logs_id_seq'),
+            response TEXT NOT NULL,
+            request_id INTEGER REFERENCES requests (id),
+            PRIMARY KEY (id)
+        )
+    """)
+    op.create_index('ix_logs_id', 'logs', ['id'], unique=False)
+    op.create_index(
+        'ix_logs_request_id_id', 'logs', ['request_id', 'id'], unique=False
+    )
+
+    op.execute("INSERT INTO logs (id, response, request_id) "
+               "SELECT id, response, request_id FROM logs_partitioned")
+    op.execute("ALTER SEQUENCE logs_id_seq OWNED BY logs.id")
+    # Dropping the parent drops every partition with it
+    op.drop_table('logs_partitioned')
@@ -0,0 +1,31 @@
+"""Add request username
+
+Revision ID: 7c0323f996c8
+Revises: 185079d11702
+Create Date: 2026-10-15 14:20:44.305981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c0323f996c8'
+down_revision: Union[str, None] = '185079d11702'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('requests', sa.Column('username', sa.String(), nullable=True))
+    # Backfill from the owning users
+    op.execute(
+        "UPDATE requests SET username = users.username "
+        "FROM users WHERE requests.user_id = users.id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('requests', 'username')
@@ -0,0 +1,41 @@
+"""Add username and role name indexes
+
+Revision ID: ea35aa9bcb0c
+Revises: ae9dcf903d0f
+Create Date: 2026-10-15 09:12:40.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ea35aa9bcb0c'
+down_revision: Union[str, None] = 'ae9dcf903d0f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build the indexes without locking writes on the tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_users_username'), 'users', ['username'],
+            unique=True, postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f('ix_roles_name'), 'roles', ['name'],
+            unique=True, postgresql_concurrently=True,
+        )
+
+    # The unique indexes replace the original unique constraints
+    op.drop_constraint('users_username_key', 'users', type_='unique')
+    op.drop_constraint('roles_name_key', 'roles', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint('roles_name_key', 'roles', ['name'])
+    op.create_unique_constraint('users_username_key', 'users', ['username'])
+    op.drop_index(op.f('ix_roles_name'), table_name='roles')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
@@ -0,0 +1,38 @@
+"""Add request bottoken_hash
+
+Revision ID: f2287592d137
+Revises: 11c843f41dd1
+Create Date: 2026-10-15 15:31:58.920417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2287592d137'
+down_revision: Union[str, None] = '11c843f41dd1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('requests', sa.Column(
+        'bottoken_hash', sa.LargeBinary(length=32), nullable=True
+    ))
+    # Backfill with the same SHA-256 digest the application computes
+    op.execute(
+        "UPDATE requests "
+        "SET bottoken_hash = sha256(convert_to(bottoken, 'UTF8'))"
+    )
+    op.create_index(
+        op.f('ix_requests_bottoken_hash'), 'requests', ['bottoken_hash'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_requests_bottoken_hash'), table_name='requests')
+    op.drop_column('requests', 'bottoken_hash')
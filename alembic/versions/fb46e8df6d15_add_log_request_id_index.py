@@ -0,0 +1,27 @@
+"""Add log request_id index
+
+Revision ID: fb46e8df6d15
+Revises: fdb09f385fba
+Create Date: 2026-10-15 11:27:51.804316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fb46e8df6d15'
+down_revision: Union[str, None] = 'fdb09f385fba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f('ix_logs_request_id'), 'logs', ['request_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_logs_request_id'), table_name='logs')
@@ -0,0 +1,38 @@
+"""Add manager_id and request user index
+
+Revision ID: fdb09f385fba
+Revises: ea35aa9bcb0c
+Create Date: 2026-10-15 09:41:03.552917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fdb09f385fba'
+down_revision: Union[str, None] = 'ea35aa9bcb0c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('manager_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'users_manager_id_fkey', 'users', 'users', ['manager_id'], ['id']
+    )
+    op.create_index(
+        op.f('ix_users_manager_id'), 'users', ['manager_id'], unique=False
+    )
+    op.create_index(
+        op.f('ix_requests_user_id'), 'requests', ['user_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_requests_user_id'), table_name='requests')
+    op.drop_index(op.f('ix_users_manager_id'), table_name='users')
+    op.drop_constraint('users_manager_id_fkey', 'users', type_='foreignkey')
+    op.drop_column('users', 'manager_id')
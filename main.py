@@ -1,9 +1,22 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import (
+    FastAPI,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from jose import jwt
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import Text, case, cast, func, insert, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import datetime, timedelta, timezone
+import jwt
 from passlib.context import CryptContext
 from telegram import Update
 from telegram.ext import (
@@ -14,11 +27,31 @@ from telegram.ext import (
     ContextTypes,
 )
 from dotenv import load_dotenv
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import hashlib
+import logging
 import os
-
-
-from models import Role, User, Request
-from database import SessionLocal
+import queue
+import secrets
+import time
+
+
+from models import (
+    BOT_TOKEN_MAX_LENGTH,
+    MESSAGE_MAX_LENGTH,
+    Log,
+    Role,
+    User,
+    Request,
+    compress_log_response,
+    hash_bot_token,
+)
+from database import AsyncSessionLocal
+from roles_cache import get_role, get_role_id, load_roles
 
 
 load_dotenv()
@@ -28,33 +61,70 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+DEFAULT_TOKEN_EXPIRE = timedelta(minutes=15)
 TOKEN = os.getenv("TELEGRAM_TOKEN")
 BOT_USERNAME = "@request_api_telegram_bot"
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # Public HTTPS base URL of this app
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+WEBHOOK_PATH = "/telegram/webhook"
+ALLOWED_ROLES = ["admin", "manager", "user"]
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+
+# Logging, records go through a queue and are written by a listener thread
+log_queue = queue.Queue(-1)
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(
+    logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+)
+log_listener = QueueListener(log_queue, log_handler)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(LOG_LEVEL)
+logger.addHandler(QueueHandler(log_queue))
 
 
 # FastAPI app instance
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # OAuth2 for JWT
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
 # Dependency to get the database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-# Password hashing utility
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing utility (Argon2id, bcrypt kept to verify legacy hashes)
+@lru_cache(maxsize=1)
+def get_pwd_context() -> CryptContext:
+    # Built on first use so hash backends load on first auth, not at import
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__memory_cost=46 * 1024,
+        argon2__time_cost=1,
+        argon2__parallelism=1,
+    )
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+# Token digest -> (user, token expiry), skips JWT decode and user lookup
+_token_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
 ):
+    # Serve recently validated tokens from the cache until they expire
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _token_cache.get(key)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+
     try:
         # Decode the token and extract username
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -68,15 +138,20 @@ def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Fetch user from database
-        user = db.query(User).filter(User.username == username).first()
+        # Fetch user from database, its role comes from the role cache
+        result = await db.execute(
+            select(User).where(User.username == username)
+        )
+        user = result.scalar_one_or_none()
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        set_committed_value(user, "role", await get_role(user.role_id))
 
+        _token_cache[key] = (user, payload["exp"])
         return user
 
     # Handle token validation errors
@@ -99,20 +174,23 @@ def verify_role(user: User, role_name: str):
 
 
 # Utility functions
-def verify_password(plain_password, hashed_password):
-    # Verify if the plain password matches the hashed password
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    # Verify the password in a worker thread to keep the event loop free
+    return await asyncio.to_thread(
+        get_pwd_context().verify, plain_password, hashed_password
+    )
 
 
-def hash_password(plain_password):
-    # Hash the plain password for secure storage
-    return pwd_context.hash(plain_password)
+async def hash_password(plain_password):
+    # Hash the password in a worker thread to keep the event loop free
+    return await asyncio.to_thread(get_pwd_context().hash, plain_password)
 
 
-def authenticate_user(db, username: str, password: str):
+async def authenticate_user(db, username: str, password: str):
     # Fetch user by username and verify the password
-    user = db.query(User).filter(User.username == username).first()
-    if user and verify_password(password, user.hashed_password):
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalar_one_or_none()
+    if user and await verify_password(password, user.hashed_password):
         return user
     return None
 
@@ -120,69 +198,262 @@ def authenticate_user(db, username: str, password: str):
 def create_access_token(data: dict, expires_delta: timedelta = None):
     # Create and encode an access token with optional expiration time
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
+    expire = datetime.now(timezone.utc) + (
+        expires_delta or DEFAULT_TOKEN_EXPIRE
+    )
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def create_user_in_db(
-    db: Session, username: str, password: str, role_name: str
+async def create_user_in_db(
+    db: AsyncSession, username: str, password: str, role_name: str
 ):
     # Hash password and create a new user with a specific role in the database
-    hashed_password = hash_password(password)
-    user_role = db.query(Role).filter(Role.name == role_name).first()
-    if not user_role:
-        # If role doesn't exist, create it
-        user_role = Role(name=role_name)
-        db.add(user_role)
-        db.commit()
-        db.refresh(user_role)
-
+    hashed_password = await hash_password(password)
     new_user = User(
         username=username,
         hashed_password=hashed_password,
-        role_id=user_role.id,
+        role_id=await get_role_id(role_name),
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
 # Pydantic models
 class UserCreate(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     username: str
     password: str
     role_name: str
 
 
 class UserRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     username: str
     role_id: int
 
 
 class Token(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str
 
 
 class RequestCreate(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    bottoken: str = Field(max_length=BOT_TOKEN_MAX_LENGTH)
+    chatid: int = Field(ge=-(2**63), le=2**63 - 1)  # BIGINT column range
+    message: str = Field(max_length=MESSAGE_MAX_LENGTH)
+
+
+class RequestUserRead(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    username: str
+    role: str | None
+
+
+class RequestRead(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: int
     bottoken: str
-    chatid: str
+    chatid: int
     message: str
+    user_id: int | None
+    username: str | None
+    user: RequestUserRead | None
+
+
+# Request and log batching
+REQUEST_BATCH_SIZE = 100
+REQUEST_BATCH_WAIT = 0.01  # seconds
+LOG_BATCH_SIZE = 500
+LOG_BATCH_WAIT = 0.1  # seconds
+
+# Pending request rows, written in batches by flush_request_queue
+request_queue: asyncio.Queue = asyncio.Queue()
+
+# Pending bot response logs, written in batches by flush_log_queue
+log_entry_queue: asyncio.Queue = asyncio.Queue()
+
+# Queued by stop_batch_writer, the writer saves its batch and exits on it
+STOP_BATCHING = object()
+
+
+async def next_batch(pending: asyncio.Queue, size: int, wait: float):
+    # Wait for one item, then collect more until the batch is full, the
+    # wait time has passed or STOP_BATCHING is taken off the queue
+    loop = asyncio.get_running_loop()
+    batch = [await pending.get()]
+    deadline = loop.time() + wait
+    while len(batch) < size and batch[-1] is not STOP_BATCHING:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(pending.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+def drain_queue(pending: asyncio.Queue):
+    # Take everything left in the queue without waiting
+    batch = []
+    while not pending.empty():
+        batch.append(pending.get_nowait())
+    return batch
+
+
+async def run_batch_writer(
+    pending: asyncio.Queue, size: int, wait: float, save
+):
+    # Save batches from the queue until STOP_BATCHING comes through
+    while True:
+        batch = await next_batch(pending, size, wait)
+        stopping = batch[-1] is STOP_BATCHING
+        if stopping:
+            batch.pop()
+        if batch:
+            await save(batch)
+        if stopping:
+            return
+
+
+async def stop_batch_writer(
+    writer: asyncio.Task, pending: asyncio.Queue, save
+):
+    # Let the writer finish the batch it holds instead of cancelling it
+    # mid-INSERT, then save whatever was queued after the stop marker
+    pending.put_nowait(STOP_BATCHING)
+    await writer
+    batch = drain_queue(pending)
+    if batch:
+        await save(batch)
+
+
+async def save_request_batch(batch: list[dict]):
+    # Insert the whole batch with one executemany and commit
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(Request), batch)
+            await db.commit()
+        return
+    except Exception as e:
+        logger.warning(
+            "Failed to save %d queued requests, retrying one by one: %s",
+            len(batch),
+            e,
+        )
+
+    # One rejected row fails the whole executemany, retry each row on its
+    # own so only the bad rows are dropped
+    for row in batch:
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(Request), row)
+                await db.commit()
+        except Exception as e:
+            logger.error(
+                "Failed to save queued request of user %s for chat %s: %s",
+                row.get("user_id"),
+                row.get("chatid"),
+                e,
+            )
+
+
+async def flush_request_queue():
+    # Drain up to REQUEST_BATCH_SIZE rows or REQUEST_BATCH_WAIT per batch
+    await run_batch_writer(
+        request_queue,
+        REQUEST_BATCH_SIZE,
+        REQUEST_BATCH_WAIT,
+        save_request_batch,
+    )
+
+
+async def bulk_log(db: AsyncSession, entries: list[dict]):
+    # Insert all log entries with one executemany and a single commit,
+    # responses are stored zstd-compressed
+    rows = [
+        {
+            "response_zst": compress_log_response(entry["response"]),
+            "request_id": entry["request_id"],
+        }
+        for entry in entries
+    ]
+    await db.execute(insert(Log), rows)
+    await db.commit()
+
+
+async def save_log_batch(batch: list[dict]):
+    # Write a batch of log entries, a failed batch must not stop the writer
+    try:
+        async with AsyncSessionLocal() as db:
+            await bulk_log(db, batch)
+    except Exception as e:
+        logger.error("Failed to save %d queued logs: %s", len(batch), e)
+
+
+async def flush_log_queue():
+    # Drain up to LOG_BATCH_SIZE entries or LOG_BATCH_WAIT per batch
+    await run_batch_writer(
+        log_entry_queue, LOG_BATCH_SIZE, LOG_BATCH_WAIT, save_log_batch
+    )
+
+
+# Startup events
+@app.on_event("startup")
+async def start_logging():
+    # Write queued log records from a background thread
+    log_listener.start()
+
+
+@app.on_event("startup")
+async def configure_executor():
+    # Size the default thread pool used for password hashing to the CPU count
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=os.cpu_count()))
+
+
+@app.on_event("startup")
+async def warm_role_cache():
+    # Warm the role caches so auth and user creation skip the roles lookup
+    await load_roles()
+    for role in ALLOWED_ROLES:
+        await get_role_id(role.capitalize())
+
+
+@app.on_event("startup")
+async def start_request_batching():
+    # Run the batch writer for queued requests in the background
+    app.state.request_flusher = asyncio.create_task(flush_request_queue())
+
+
+# Shutdown events
+@app.on_event("shutdown")
+async def stop_request_batching():
+    # Stop the batch writer without losing queued or in-flight requests
+    await stop_batch_writer(
+        app.state.request_flusher, request_queue, save_request_batch
+    )
 
 
 # API Endpoints
 @app.post("/token", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     # Authenticate user using provided username and password
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         # Raise error if credentials are invalid
         raise HTTPException(
@@ -191,12 +462,9 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Set expiration time for access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-
     # Create access token for authenticated user
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username}, expires_delta=ACCESS_TOKEN_EXPIRE
     )
 
     # Return the access token and token type
@@ -204,21 +472,21 @@ async def login(
 
 
 @app.post("/users", response_model=UserRead)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    # Define allowed roles in lowercase
-    allowed_roles = ["admin", "manager", "user"]
-
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Validate role (case-insensitive)
     role_lower = user.role_name.lower()
-    if role_lower not in allowed_roles:
+    if role_lower not in ALLOWED_ROLES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid role. Choose one of: "
-            f"{', '.join([role.capitalize() for role in allowed_roles])}",
+            f"{', '.join([role.capitalize() for role in ALLOWED_ROLES])}",
         )
 
     # Check if username is already registered
-    db_user = db.query(User).filter(User.username == user.username).first()
+    result = await db.execute(
+        select(User).where(User.username == user.username)
+    )
+    db_user = result.scalar_one_or_none()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -226,39 +494,31 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
         )
 
     # Create and return the new user
-    new_user = create_user_in_db(
+    new_user = await create_user_in_db(
         db, user.username, user.password, role_name=role_lower.capitalize()
     )
     return new_user
 
 
-@app.get("/requests")
-async def get_requests(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    # Admin: Return all requests
+def scoped_requests_query(current_user: User):
+    # Requests visible to the user, wrapped by requests_as_json, so no ORM
+    # objects are loaded from it
+    query = select(Request)
+
+    # Admin: All requests
     if current_user.role.name == "Admin":
-        return db.query(Request).all()
+        return query
 
-    # Manager: Return requests from users managed by this manager
+    # Manager: Requests from users managed by this manager
     if current_user.role.name == "Manager":
-        # Filter by `managed_user_ids` (users under the manager)
-        managed_users = (
-            db.query(User.id).filter(User.manager_id == current_user.id).all()
-        )
-        managed_user_ids = [user[0] for user in managed_users]
-        return (
-            db.query(Request)
-            .filter(Request.user_id.in_(managed_user_ids))
-            .all()
+        # Join on the request owner to filter by users under the manager
+        return query.join(User, Request.user_id == User.id).where(
+            User.manager_id == current_user.id
         )
 
-    # User: Return only their own requests
+    # User: Only their own requests
     if current_user.role.name == "User":
-        return (
-            db.query(Request).filter(Request.user_id == current_user.id).all()
-        )
+        return query.where(Request.user_id == current_user.id)
 
     # Default: Access denied
     raise HTTPException(
@@ -266,10 +526,139 @@ async def get_requests(
     )
 
 
-@app.post("/requests")
+def requests_as_json(query, aggregate: bool = False):
+    # Wrap a request query so PostgreSQL builds the RequestRead JSON itself,
+    # owner and role included, in one statement and without ORM objects.
+    # The username comes from the row, cascade_username keeps it current
+    page = aliased(Request, query.subquery())
+    row = func.json_build_object(
+        "id",
+        page.id,
+        "bottoken",
+        page.bottoken,
+        "chatid",
+        page.chatid,
+        "message",
+        page.message,
+        "user_id",
+        page.user_id,
+        "username",
+        page.username,
+        "user",
+        case(
+            (page.user_id.is_(None), None),
+            else_=func.json_build_object(
+                "username", page.username, "role", Role.name
+            ),
+        ),
+    )
+    if aggregate:
+        # One JSON array for the whole page, "[]" when it is empty
+        column = func.coalesce(
+            cast(func.json_agg(aggregate_order_by(row, page.id)), Text), "[]"
+        )
+    else:
+        column = cast(row, Text)
+
+    stmt = (
+        select(column)
+        .select_from(page)
+        .outerjoin(User, page.user_id == User.id)
+        .outerjoin(Role, User.role_id == Role.id)
+    )
+    return stmt if aggregate else stmt.order_by(page.id)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match may list several tags, weak W/ tags or "*"
+    if if_none_match is None:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@app.get("/requests", response_model=list[RequestRead])
+async def get_requests(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: int | None = None,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Keyset pagination on the primary key, pass the last seen id as cursor
+    query = scoped_requests_query(current_user)
+    if cursor is not None:
+        query = query.where(Request.id > cursor)
+
+    # The page arrives as a ready JSON array and is sent on unchanged
+    page = await db.scalar(
+        requests_as_json(query.order_by(Request.id).limit(limit), True)
+    )
+
+    # Tag the page by its content, renamed owners, role changes and
+    # reassigned managers all change the page and so the tag
+    etag = f'"{hashlib.blake2b(page.encode(), digest_size=16).hexdigest()}"'
+    if etag_matches(if_none_match, etag):
+        # Client copy is current, skip sending the body
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    return Response(
+        content=page, media_type="application/json", headers={"ETag": etag}
+    )
+
+
+@app.get("/requests/export")
+async def export_requests(current_user: User = Depends(get_current_user)):
+    # Stream every visible request as JSON lines using a server-side cursor
+    query = requests_as_json(scoped_requests_query(current_user))
+
+    async def generate():
+        # Own session, dependency sessions are closed before the body streams
+        async with AsyncSessionLocal() as db:
+            # A slow reader leaves the cursor's transaction idle between
+            # fetches, keep idle_in_transaction_session_timeout from ending it
+            await db.execute(
+                text("SET LOCAL idle_in_transaction_session_timeout = 0")
+            )
+            result = await db.stream(query.execution_options(yield_per=500))
+            async for row in result.scalars():
+                yield row + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.post("/requests", status_code=status.HTTP_202_ACCEPTED)
 async def create_request(
     request: RequestCreate,  # Accepts request data (bottoken, chatid, message)
-    db: Session = Depends(get_db),  # Database session dependency
+    current_user: User = Depends(
+        get_current_user
+    ),  # Gets the current authenticated user
+):
+    # Queue the request, the background writer saves it in the next batch
+    request_queue.put_nowait(
+        {
+            "bottoken": request.bottoken,
+            "bottoken_hash": hash_bot_token(request.bottoken),
+            "chatid": request.chatid,
+            "message": request.message,
+            "user_id": current_user.id,
+            "username": current_user.username,
+        }
+    )
+
+    # Return accepted message, the request is saved asynchronously
+    return {"message": "Request queued"}
+
+
+@app.post("/requests/sync")
+async def create_request_sync(
+    request: RequestCreate,  # Accepts request data (bottoken, chatid, message)
+    db: AsyncSession = Depends(get_db),  # Database session dependency
     current_user: User = Depends(
         get_current_user
     ),  # Gets the current authenticated user
@@ -280,12 +669,12 @@ async def create_request(
         chatid=request.chatid,
         message=request.message,
         user_id=current_user.id,  # Associates request with the current user
+        username=current_user.username,  # Copied for display in listings
     )
 
     # Add the new request to the session and commit to save it in the database
     db.add(new_request)
-    db.commit()
-    db.refresh(new_request)  # Refresh the object to get the updated values
+    await db.commit()
 
     # Return success message after creating the request
     return {"message": "Request created"}
@@ -295,9 +684,11 @@ async def create_request(
 
 
 def handle_response(text: str) -> str:
-    if "hello" in text.lower():
+    # Lowercase once and reuse it for every keyword check
+    lowered = text.lower()
+    if "hello" in lowered:
         return "Hello! How can I help you today?"
-    elif "help" in text.lower():
+    elif "help" in lowered:
         return "Please ask me anything, I am here to help!"
     else:
         return "I'm sorry, I didn't understand that."
@@ -324,24 +715,23 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.message.chat.id
     text = update.message.text
 
-    # Print the received message for debugging
-    print(f'User {chat_id} sent: "{text}"')
+    # Log the received message for debugging
+    logger.debug('User %s sent: "%s"', chat_id, text)
 
-    # Save the message to the database
-    db = next(get_db())  # Get the database session
-    new_request = Request(
-        bottoken=os.getenv("TELEGRAM_TOKEN"),  # Use your bot token
-        chatid=str(chat_id),  # Store chat ID as a string
-        message=text,
-    )
+    # Save the message to the database, the session closes with the block
+    async with AsyncSessionLocal() as db:
+        new_request = Request(
+            bottoken=os.getenv("TELEGRAM_TOKEN"),  # Use your bot token
+            chatid=chat_id,
+            message=text,
+        )
 
-    # Add and commit to the database
-    db.add(new_request)
-    db.commit()
-    db.refresh(new_request)
+        # Add and commit to the database
+        db.add(new_request)
+        await db.commit()
 
     # Log the saved message to confirm it's in the database
-    print(f"Saved message from chat {chat_id} to DB.")
+    logger.debug("Saved message from chat %s to DB.", chat_id)
 
     # Generate a response based on the message content
     response = handle_response(text)
@@ -349,10 +739,34 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Send a reply to the user
     await update.message.reply_text(response)
 
+    # Record the reply, it is saved with the next log batch
+    log_entry_queue.put_nowait(
+        {"response": response, "request_id": new_request.id}
+    )
 
-if __name__ == "__main__":
-    print("Starting bot...")
-    application = Application.builder().token(TOKEN).build()
+
+async def start_log_writer(application: Application):
+    # Run the batch writer for bot response logs alongside the bot
+    application.bot_data["log_writer"] = asyncio.create_task(flush_log_queue())
+
+
+async def stop_log_writer(application: Application):
+    # Stop the batch writer without losing queued or in-flight logs
+    await stop_batch_writer(
+        application.bot_data["log_writer"], log_entry_queue, save_log_batch
+    )
+
+
+def build_bot_application() -> Application:
+    # Create the bot application and register its handlers, polling runs
+    # the log writer hooks itself, webhook mode calls them on app startup
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .post_init(start_log_writer)
+        .post_shutdown(stop_log_writer)
+        .build()
+    )
 
     # Add handlers for bot commands
     application.add_handler(CommandHandler("start", start_command))
@@ -363,7 +777,81 @@ if __name__ == "__main__":
     application.add_handler(
         MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message)
     )
+    return application
+
+
+@app.on_event("startup")
+async def start_bot_webhook():
+    # Let Telegram push updates to this app when a public URL is configured
+    if not (TOKEN and WEBHOOK_URL):
+        return
+    # Without a secret anyone could post forged updates to the webhook
+    if not WEBHOOK_SECRET:
+        logger.error("WEBHOOK_SECRET is not set, not registering the webhook")
+        return
+
+    application = build_bot_application()
+    await application.initialize()
+    await application.start()
+    await start_log_writer(application)
+    await application.bot.set_webhook(
+        url=f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+        secret_token=WEBHOOK_SECRET,
+        allowed_updates=Update.ALL_TYPES,
+    )
+    app.state.bot_application = application
+    logger.info("Telegram webhook set to %s%s", WEBHOOK_URL, WEBHOOK_PATH)
+
+
+@app.on_event("shutdown")
+async def stop_bot_webhook():
+    # Stop processing updates, the webhook stays registered with Telegram
+    application = getattr(app.state, "bot_application", None)
+    if application is not None:
+        await application.stop()
+        await stop_log_writer(application)
+        await application.shutdown()
+
+
+@app.post(WEBHOOK_PATH, include_in_schema=False)
+async def telegram_webhook(
+    payload: dict,
+    x_telegram_bot_api_secret_token: str | None = Header(None),
+):
+    # Reject updates that do not come from Telegram
+    application = getattr(app.state, "bot_application", None)
+    if application is None or not secrets.compare_digest(
+        (x_telegram_bot_api_secret_token or "").encode(),
+        WEBHOOK_SECRET.encode(),
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied"
+        )
+
+    # Hand the update to the bot, it is processed in the background
+    await application.update_queue.put(
+        Update.de_json(payload, application.bot)
+    )
+    return {"ok": True}
+
+
+# Registered last so it runs after every other shutdown handler, records
+# logged while the writers and the bot stop still reach the handler
+@app.on_event("shutdown")
+async def stop_logging():
+    # Flush remaining log records and stop the listener thread
+    log_listener.stop()
+
+
+if __name__ == "__main__":
+    # Local development without a public URL, poll Telegram for updates
+    log_listener.start()
+    logger.info("Starting bot...")
+    application = build_bot_application()
 
     # Run the bot
-    print("Polling...")
-    application.run_polling(poll_interval=3)
+    logger.info("Polling...")
+    try:
+        application.run_polling(poll_interval=3)
+    finally:
+        log_listener.stop()
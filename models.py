@@ -1,40 +1,120 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    String,
+    ForeignKey,
+    Index,
+    LargeBinary,
+    event,
+    update,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy.orm.attributes import get_history
 from database import Base
+import hashlib
+import zstandard
+
+
+# Telegram's limit for a single text message
+MESSAGE_MAX_LENGTH = 4096
+# Telegram bot tokens are "<bot id>:<35 char secret>"
+BOT_TOKEN_MAX_LENGTH = 46
+
+
+def hash_bot_token(bottoken: str) -> bytes:
+    # Fixed-size digest used for equality lookups on bot tokens
+    return hashlib.sha256(bottoken.encode()).digest()
+
+
+def compress_log_response(response: str) -> bytes:
+    # Log bodies are mostly ASCII text/JSON and shrink several times
+    return zstandard.ZstdCompressor(level=3).compress(response.encode())
+
+
+def decompress_log_response(response_zst: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(response_zst).decode()
 
 
 # Role Model
 class Role(Base):
     __tablename__ = "roles"
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    name: Mapped[str] = mapped_column(String, unique=True, index=True)
 
 
 # User Model
 class User(Base):
     __tablename__ = "users"
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String, unique=True, nullable=False)
-    hashed_password = Column(String, nullable=False)
-    role_id = Column(Integer, ForeignKey("roles.id"))
-    role = relationship("Role")
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    username: Mapped[str] = mapped_column(String, unique=True, index=True)
+    hashed_password: Mapped[str] = mapped_column(String)
+    role_id: Mapped[int | None] = mapped_column(ForeignKey("roles.id"))
+    manager_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id"), index=True
+    )
+    # Never loaded from the database, resolve it with roles_cache.get_role
+    role: Mapped["Role | None"] = relationship(lazy="raise")
 
 
 # Request Model
 class Request(Base):
     __tablename__ = "requests"
-    id = Column(Integer, primary_key=True, index=True)
-    bottoken = Column(String, nullable=False)
-    chatid = Column(String, nullable=False)
-    message = Column(Text, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    user = relationship("User")
+    # Fetch server-generated values with RETURNING in the INSERT itself
+    __mapper_args__ = {"eager_defaults": True}
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    bottoken: Mapped[str] = mapped_column(String(BOT_TOKEN_MAX_LENGTH))
+    # SHA-256 of bottoken, look requests up by token with this column
+    bottoken_hash: Mapped[bytes | None] = mapped_column(
+        LargeBinary(32), index=True
+    )
+    chatid: Mapped[int] = mapped_column(BigInteger, index=True)
+    message: Mapped[str] = mapped_column(String(MESSAGE_MAX_LENGTH))
+    user_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id"), index=True
+    )
+    # Copy of user.username so listings don't need to join users
+    username: Mapped[str | None] = mapped_column(String)
+    user: Mapped["User | None"] = relationship(lazy="selectin")
+
+    @validates("bottoken")
+    def validate_bottoken(self, key, bottoken):
+        # Keep the lookup hash in step with the token
+        self.bottoken_hash = hash_bot_token(bottoken)
+        return bottoken
+
+
+# Keep the copied usernames on requests in sync when a user is renamed
+@event.listens_for(User, "after_update")
+def cascade_username(mapper, connection, target):
+    if get_history(target, "username").has_changes():
+        connection.execute(
+            update(Request)
+            .where(Request.user_id == target.id)
+            .values(username=target.username)
+        )
 
 
 # Log Model
 class Log(Base):
     __tablename__ = "logs"
-    id = Column(Integer, primary_key=True, index=True)
-    response = Column(Text, nullable=False)
-    request_id = Column(Integer, ForeignKey("requests.id"))
-    request = relationship("Request")
+    # Serves request_id lookups and "latest log for a request" tail reads.
+    # Partitioned by id ranges so old logs are removed with DROP TABLE on a
+    # partition (logs_p0, logs_p1, ... of 10M ids each, see migrations)
+    __table_args__ = (
+        Index("ix_logs_request_id_id", "request_id", "id"),
+        {"postgresql_partition_by": "RANGE (id)"},
+    )
+    __mapper_args__ = {"eager_defaults": True}
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # zstd-compressed response body, not loaded with the row, use
+    # undefer(Log.response_zst) to fetch it and read it through .response
+    response_zst: Mapped[bytes] = mapped_column(LargeBinary, deferred=True)
+    request_id: Mapped[int | None] = mapped_column(ForeignKey("requests.id"))
+    request: Mapped["Request | None"] = relationship()
+
+    @property
+    def response(self) -> str:
+        return decompress_log_response(self.response_zst)
+
+    @response.setter
+    def response(self, response: str):
+        self.response_zst = compress_log_response(response)
@@ -0,0 +1,66 @@
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from models import Role
+from database import AsyncSessionLocal
+
+
+# In-process role caches, roles are reference data and change rarely
+_role_ids: dict[str, int] = {}  # Role name -> role id
+_roles: dict[int, Role] = {}  # Role id -> detached Role
+
+
+async def load_roles():
+    # Load every role with one query and replace the cached entries
+    async with AsyncSessionLocal() as db:
+        roles = (await db.execute(select(Role))).scalars().all()
+
+    clear_role_cache()
+    for role in roles:
+        _roles[role.id] = role
+        _role_ids[role.name] = role.id
+
+
+async def get_role(role_id: int | None) -> Role | None:
+    # Return the cached role, reloading the roles on a miss
+    if role_id is None:
+        return None
+    if role_id not in _roles:
+        await load_roles()
+    return _roles.get(role_id)
+
+
+async def get_role_id(role_name: str) -> int:
+    # Return the cached role id, loading (or creating) the role on a miss
+    if role_name in _role_ids:
+        return _role_ids[role_name]
+
+    # Create the role if it doesn't exist and return its id in one statement
+    stmt = (
+        pg_insert(Role)
+        .values(name=role_name)
+        .on_conflict_do_update(
+            index_elements=[Role.name], set_={"name": role_name}
+        )
+        .returning(Role.id)
+    )
+    async with AsyncSessionLocal() as db:
+        role_id = (await db.execute(stmt)).scalar_one()
+        await db.commit()
+
+    _role_ids[role_name] = role_id
+    return role_id
+
+
+def clear_role_cache():
+    # Drop all cached roles, they are loaded again on the next lookup
+    _role_ids.clear()
+    _roles.clear()
+
+
+# Invalidate the cache whenever a role is changed through the ORM
+@event.listens_for(Role, "after_insert")
+@event.listens_for(Role, "after_update")
+@event.listens_for(Role, "after_delete")
+def invalidate_role_cache(mapper, connection, target):
+    clear_role_cache()
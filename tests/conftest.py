@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+import os
+import pytest
+import uuid
+
+# Sign test tokens and keep the Telegram webhook off, load_dotenv in the
+# app does not override variables that are already set
+os.environ.setdefault("SECRET_KEY", "test_secret_key")
+os.environ["WEBHOOK_URL"] = ""
+
+from database import engine  # noqa: E402
+from main import app  # noqa: E402
+
+
+# Collect the SQL statements run on a connection or engine, used to check
+# that a code path stays within its expected number of queries (N+1 guard)
+@contextmanager
+def collect_queries(conn=engine.sync_engine):
+    queries = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        queries.append(statement)
+
+    event.listen(conn, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(conn, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def count_queries():
+    # Context manager yielding the statements run inside its block
+    return collect_queries
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Run the app with its startup and shutdown events against the database,
+    # once per session as pooled connections and queues stay on one loop
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def make_user(client):
+    # Create a user with a unique name and return its auth headers
+    def make_user(role_name: str = "User"):
+        username = f"test_{uuid.uuid4().hex}"
+        response = client.post(
+            "/users",
+            json={
+                "username": username,
+                "password": "password",
+                "role_name": role_name,
+            },
+        )
+        assert response.status_code == 200, response.text
+        response = client.post(
+            "/token", data={"username": username, "password": "password"}
+        )
+        assert response.status_code == 200, response.text
+        token = response.json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return make_user
@@ -0,0 +1,109 @@
+from sqlalchemy import func, select
+import asyncio
+import random
+
+from database import AsyncSessionLocal
+from main import (
+    STOP_BATCHING,
+    next_batch,
+    run_batch_writer,
+    save_request_batch,
+    stop_batch_writer,
+)
+from models import Request
+
+
+def queue_of(*items):
+    pending = asyncio.Queue()
+    for item in items:
+        pending.put_nowait(item)
+    return pending
+
+
+def test_next_batch_stops_when_full():
+    async def run():
+        pending = queue_of(1, 2, 3, 4, 5)
+        assert await next_batch(pending, 3, 1) == [1, 2, 3]
+        assert pending.qsize() == 2
+
+    asyncio.run(run())
+
+
+def test_next_batch_stops_after_wait():
+    async def run():
+        pending = queue_of(1, 2)
+        assert await next_batch(pending, 10, 0.01) == [1, 2]
+
+    asyncio.run(run())
+
+
+def test_next_batch_stops_at_stop_marker():
+    async def run():
+        pending = queue_of(1, STOP_BATCHING, 2)
+        assert await next_batch(pending, 10, 1) == [1, STOP_BATCHING]
+        assert pending.qsize() == 1
+
+    asyncio.run(run())
+
+
+def test_run_batch_writer_saves_until_stop_marker():
+    async def run():
+        saved = []
+
+        async def save(batch):
+            saved.append(batch)
+
+        pending = queue_of(1, 2, STOP_BATCHING, 3)
+        await run_batch_writer(pending, 10, 1, save)
+        assert saved == [[1, 2]]
+        assert pending.qsize() == 1
+
+    asyncio.run(run())
+
+
+def test_stop_batch_writer_keeps_in_flight_and_queued_items():
+    async def run():
+        saved = []
+
+        async def save(batch):
+            # Slow enough that shutdown arrives while a batch is in flight
+            await asyncio.sleep(0.05)
+            saved.extend(batch)
+
+        pending = queue_of(*range(30))
+        writer = asyncio.create_task(run_batch_writer(pending, 10, 1, save))
+        await asyncio.sleep(0.01)
+        for item in range(30, 35):
+            pending.put_nowait(item)
+        await stop_batch_writer(writer, pending, save)
+        assert writer.done()
+        assert sorted(saved) == list(range(35))
+
+    asyncio.run(run())
+
+
+def test_save_request_batch_drops_only_bad_rows(client):
+    # chatid beyond BIGINT fails the batch, the other rows are still saved
+    chat_ids = random.sample(range(10**12, 10**13), 3)
+    rows = [
+        {
+            "bottoken": "token",
+            "chatid": chat_id,
+            "message": "hi",
+            "user_id": None,
+            "username": None,
+        }
+        for chat_id in chat_ids
+    ]
+    rows.insert(1, {**rows[0], "chatid": 2**63})
+
+    async def saved_count():
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(
+                select(func.count(Request.id)).where(
+                    Request.chatid.in_(chat_ids)
+                )
+            )
+
+    client.portal.call(save_request_batch, rows)
+    assert client.portal.call(saved_count) == 3
@@ -0,0 +1,76 @@
+def create_requests(client, headers, count):
+    for number in range(count):
+        response = client.post(
+            "/requests/sync",
+            json={"bottoken": "token", "chatid": number, "message": "hi"},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+
+
+def test_list_requests_query_count(client, make_user, count_queries):
+    # The listing costs the same queries however many requests it returns
+    headers = make_user()
+    create_requests(client, headers, 1)
+    with count_queries() as queries:
+        response = client.get("/requests", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    expected = len(queries)
+
+    create_requests(client, headers, 5)
+    with count_queries() as queries:
+        response = client.get("/requests", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 6
+    assert len(queries) == expected == 1
+
+
+def test_list_requests_includes_owner(client, make_user):
+    # Owner username and role come back without touching the relationships
+    headers = make_user()
+    create_requests(client, headers, 2)
+    response = client.get("/requests", headers=headers)
+    assert response.status_code == 200
+    requests = response.json()
+    assert len(requests) == 2
+    for request in requests:
+        assert request["user"]["role"] == "User"
+        assert request["username"].startswith("test_")
+        assert request["user"]["username"] == request["username"]
+
+
+def test_list_requests_etag(client, make_user):
+    # A matching If-None-Match gets a 304, a changed page gets a new tag
+    headers = make_user()
+    create_requests(client, headers, 1)
+    response = client.get("/requests", headers=headers)
+    etag = response.headers["ETag"]
+    response = client.get(
+        "/requests", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    for if_none_match in (f'"other", W/{etag}', "*"):
+        response = client.get(
+            "/requests", headers={**headers, "If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304
+
+    create_requests(client, headers, 1)
+    response = client.get(
+        "/requests", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_create_request_rejects_chatid_beyond_bigint(client, make_user):
+    headers = make_user()
+    for path in ("/requests", "/requests/sync"):
+        response = client.post(
+            path,
+            json={"bottoken": "token", "chatid": 2**63, "message": "hi"},
+            headers=headers,
+        )
+        assert response.status_code == 422